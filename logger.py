@@ -1,9 +1,82 @@
 import os
+import re
 import sys
+import atexit
+import time
+import codecs
+import string
 import datetime
 import threading
 from typing import Optional
 
+_FILE_BUFFER_SIZE = 1 << 16
+_TZ_REFRESH_INTERVAL = 1800
+_COMMIT_THRESHOLD = 1 << 16
+_SCRATCH_SIZE = 4096
+_SCRATCH_SOFT_MAX = 128 * 1024
+_RING_SIZE = 1 << 20
+_DRAIN_INTERVAL = 0.1
+_WRITER_RUNNING = 0
+_WRITER_POLLING = 1
+_WRITER_SLEEPING = 2
+
+_active: Optional["Logger"] = None
+
+_STRFTIME_DIRECTIVE = re.compile(r'%[-_0^#]?[EO]?(.)')
+_MINUTE_DIRECTIVES = frozenset('aAbBCdDeFgGhHIjmMnpRtuUVwWyYzZ%')
+
+def _timestamp_resolution(timestamp_format: str) -> int:
+    directives = set(_STRFTIME_DIRECTIVE.findall(timestamp_format))
+    if 'f' in directives:
+        return 0
+    if directives <= _MINUTE_DIRECTIVES:
+        return 60
+    return 1
+
+def _log_format_has_date(log_format: str) -> bool:
+    has_year = '%Y' in log_format or '%y' in log_format
+    has_month_day = any(d in log_format for d in ('%m', '%b', '%B')) and '%d' in log_format
+    return has_year and (has_month_day or '%j' in log_format)
+
+def _compile_line_format(line_format: str) -> Optional[tuple]:
+    literals, fields, current = [], [], ''
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(line_format):
+            current += literal
+            if field is not None:
+                if spec or conversion:
+                    return None
+                literals.append(current)
+                fields.append(field)
+                current = ''
+    except ValueError:
+        return None
+    if fields != ['timestamp', 'message']:
+        return None
+    literals.append(current)
+    return tuple(literal.encode('utf-8') for literal in literals)
+
+def _make_line_formatter(line_format: str):
+    line_parts = _compile_line_format(line_format)
+    if line_parts is None:
+        def format_line(line: bytes, timestamp: bytes) -> bytes:
+            formatted_line = line_format.format(timestamp=timestamp.decode('utf-8'), message=line.decode('utf-8'))
+            return f"{formatted_line}\n".encode('utf-8')
+        return format_line
+    
+    pre, mid, post = line_parts
+    post += b"\n"
+    join = b"".join
+    def format_line(line: bytes, timestamp: bytes) -> bytes:
+        return join((pre, timestamp, mid, line, post))
+    return format_line
+
+def _make_transcoding_formatter(format_line, encoder):
+    encode = encoder.encode
+    def transcode_line(line: bytes, timestamp: bytes) -> bytes:
+        return encode(format_line(line, timestamp).decode('utf-8'))
+    return transcode_line
+
 class Logging:
     def __init__(self,
         timezone: datetime.timezone,
@@ -29,11 +102,12 @@ class Logging:
         self.cleanup_on_startup = cleanup_on_startup
     
     def setup(self):
+        global _active
         if self.log_to_file:
             os.makedirs(self.logs_dir, exist_ok=True)
             if self.cleanup_on_startup:
                 self.cleanup_logs()
-        if isinstance(sys.stdout, Logger):
+        if _active is not None:
             print("Logging is already set up.")
             return
         
@@ -47,16 +121,25 @@ class Logging:
             line_format=self.line_format,
             file_encoding=self.file_encoding
         )
+        _active = logger
         sys.stdout = logger
         sys.stderr = logger
+        atexit.register(self.shutdown)
     
     def shutdown(self):
-        if isinstance(sys.stdout, Logger):
-            logger_instance = sys.stdout
+        global _active
+        if _active is not None:
+            logger_instance = _active
+            _active = None
+            atexit.unregister(self.shutdown)
             sys.stdout = logger_instance.terminal
             sys.stderr = logger_instance.terminal
             logger_instance.close()
     
+    def sync(self):
+        if _active is not None:
+            _active.sync()
+    
     def cleanup_logs(self):
         now = datetime.datetime.now(self.timezone)
         
@@ -64,12 +147,20 @@ class Logging:
             if not os.path.isdir(self.logs_dir):
                 return
             cutoff_date = now.date() - datetime.timedelta(days=self.retention_days)
+            parse_names = _log_format_has_date(self.log_format)
             with os.scandir(self.logs_dir) as entries:
                 for entry in entries:
                     if entry.is_file():
                         try:
-                            mod_time = entry.stat().st_mtime
-                            file_date = datetime.datetime.fromtimestamp(mod_time, self.timezone).date()
+                            file_date = None
+                            if parse_names:
+                                try:
+                                    file_date = datetime.datetime.strptime(entry.name, self.log_format).date()
+                                except ValueError:
+                                    pass
+                            if file_date is None:
+                                mod_time = entry.stat().st_mtime
+                                file_date = datetime.datetime.fromtimestamp(mod_time, self.timezone).date()
                             if file_date < cutoff_date:
                                 os.remove(entry.path)
                         except OSError as e:
@@ -78,6 +169,14 @@ class Logging:
             print(f"Error during log cleanup: {e}")
 
 class Logger:
+    __slots__ = (
+        'log_directory', 'timezone', 'log_format', 'timestamp_format', 'log_to_file', 'log_to_console',
+        'line_format', 'file_encoding', 'terminal', 'lock', 'log_file', 'current_log_path', 'current_day',
+        '_log_filename', '_rotate_check_at', '_tz_refresh_at', '_tz_offset', 'buffer', '_scratch', '_scratch_len', '_ts_resolution',
+        '_ts_use_offset', '_ts_cache_key', '_ts_cache_val', '_line_formatter', '_format_line', '_transcode', '_encoder', '_wakeup', '_writer_state', '_ring',
+        '_ring_head', '_ring_used', '_dropped', '_discarding', '_write_lock', '_dirty', '_stopping', '_writer_thread'
+    )
+    
     def __init__(self,
         log_directory: str,
         timezone: datetime.timezone,
@@ -102,68 +201,350 @@ class Logger:
         self.log_file: Optional[open] = None
         self.current_log_path = None
         self.current_day = None
-        self.buffer = ""
+        self._log_filename = None
+        self._rotate_check_at = 0.0
+        self._tz_refresh_at = 0.0
+        self._tz_offset = 0.0
+        self.buffer = bytearray()
+        self._scratch = bytearray(_SCRATCH_SIZE)
+        self._scratch_len = 0
+        self._ts_resolution = _timestamp_resolution(timestamp_format)
+        self._ts_use_offset = not any(d in timestamp_format for d in ('%z', '%Z', '%f'))
+        self._ts_cache_key = -1
+        self._ts_cache_val = b""
+        self._line_formatter = _make_line_formatter(line_format)
+        self._format_line = self._line_formatter
+        self._transcode = codecs.lookup(file_encoding).name != 'utf-8'
+        self._encoder = None
+        self._wakeup = threading.Lock()
+        self._wakeup.acquire()
+        self._writer_state = _WRITER_RUNNING
+        self._ring = bytearray(_RING_SIZE) if log_to_file else bytearray()
+        self._ring_head = 0
+        self._ring_used = 0
+        self._dropped = 0
+        self._discarding = False
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._stopping = False
+        self._writer_thread: Optional[threading.Thread] = None
         
         if self.log_to_file:
             self._rotate_log_if_needed()
+            self._start_writer()
     
-    def _get_expected_log_path(self):
-        today_str = datetime.datetime.now(self.timezone).strftime(self.log_format)
-        return os.path.join(self.log_directory, today_str)
+    def _start_writer(self):
+        self._writer_thread = threading.Thread(target=self._drain, name="LoggerWriter", daemon=True)
+        self._writer_thread.start()
     
     def _rotate_log_if_needed(self):
         if not self.log_to_file:
             return
-        today = datetime.datetime.now(self.timezone).date()
-        if today != self.current_day:
+        now = time.time()
+        if now < self._rotate_check_at:
+            return
+        self._rotate_check_at = now - now % 1 + 1
+        if now < self._tz_refresh_at:
+            filename = time.strftime(self.log_format, time.gmtime(now + self._tz_offset))
+            if filename == self._log_filename:
+                return
+        local_now = datetime.datetime.fromtimestamp(now, self.timezone)
+        self._tz_offset = local_now.utcoffset().total_seconds()
+        self._tz_refresh_at = now - now % _TZ_REFRESH_INTERVAL + _TZ_REFRESH_INTERVAL
+        filename = local_now.strftime(self.log_format)
+        if filename != self._log_filename:
             if self.log_file:
+                self._commit()
                 self.log_file.close()
                 print(f"Closed log file for {self.current_day}", file=self.terminal)
-            self.current_day = today
-            self.current_log_path = self._get_expected_log_path()
-            is_empty = not (os.path.exists(self.current_log_path) and os.path.getsize(self.current_log_path) > 0)
-            self.log_file = open(self.current_log_path, "a", encoding=self.file_encoding)
-            if is_empty:
-                rollover_msg = f"Logging initiated for {datetime.datetime.now(self.timezone).strftime('%A, %d %B %Y')}\n{'–'*50}\n"
-                self.write(rollover_msg, is_internal=True)
-    
-    def write(self, message: str, is_internal: bool = False):
+            self._log_filename = filename
+            self.current_day = local_now.date()
+            self.current_log_path = os.path.join(self.log_directory, filename)
+            self.log_file = open(self.current_log_path, "ab", buffering=_FILE_BUFFER_SIZE)
+            self._encoder = codecs.getincrementalencoder(self.file_encoding)()
+            if self._transcode:
+                self._format_line = _make_transcoding_formatter(self._line_formatter, self._encoder)
+            if os.fstat(self.log_file.fileno()).st_size > 0:
+                self._encoder.setstate(0)
+            else:
+                rollover_msg = f"Logging initiated for {local_now.strftime('%A, %d %B %Y')}\n{'–'*50}\n"
+                self._write_internal(rollover_msg)
+    
+    def _write_internal(self, message: str):
+        if self.log_to_console:
+            with self.lock:
+                self.terminal.write(message)
+        self.log_file.write(self._encoder.encode(message))
+    
+    def write(self, message: str):
+        if not self.log_to_file:
+            if self.log_to_console:
+                self.terminal.write(message)
+            return
+        
         with self.lock:
-            if is_internal:
-                if self.log_to_console:
-                    self.terminal.write(message)
-                if self.log_file and self.log_to_file:
-                    self.log_file.write(message)
-                return
-            
-            if self.log_to_file:
-                self._rotate_log_if_needed()
             if self.log_to_console:
                 self.terminal.write(message)
-            
-            if self.log_to_file and self.log_file:
-                self.buffer += message
-                while '\n' in self.buffer:
-                    line, self.buffer = self.buffer.split('\n', 1)
-                    if line.strip():
-                        timestamp = datetime.datetime.now(self.timezone).strftime(self.timestamp_format)
-                        formatted_line = self.line_format.format(timestamp=timestamp, message=line)
-                        self.log_file.write(f"{formatted_line}\n")
+            if self._writer_thread:
+                self._push(message.encode('utf-8'))
+                self._dirty = True
+                state = self._writer_state
+                if state and (state == _WRITER_SLEEPING or self._ring_used >= _COMMIT_THRESHOLD):
+                    self._writer_state = _WRITER_RUNNING
+                    self._wakeup.release()
+    
+    def _ring_segments(self, length: int):
+        first = min(length, len(self._ring) - self._ring_head)
+        return (self._ring_head, self._ring_head + first), (0, length - first)
+    
+    def _ring_find(self, offset: int) -> int:
+        (a0, a1), (b0, b1) = self._ring_segments(self._ring_used)
+        if a0 + offset < a1:
+            idx = self._ring.find(b'\n', a0 + offset, a1)
+            if idx != -1:
+                return idx - a0
+            offset = a1 - a0
+        idx = self._ring.find(b'\n', offset - (a1 - a0), b1)
+        return -1 if idx == -1 else idx + (a1 - a0)
+    
+    def _ring_count(self, length: int) -> int:
+        (a0, a1), (b0, b1) = self._ring_segments(length)
+        return self._ring.count(b'\n', a0, a1) + self._ring.count(b'\n', b0, b1)
+    
+    def _discard(self, size: int):
+        self._dropped += self._ring_count(size)
+        self._ring_head = (self._ring_head + size) % len(self._ring)
+        self._ring_used -= size
+    
+    def _push(self, data: bytes):
+        if self._discarding:
+            idx = data.find(b'\n')
+            if idx == -1:
+                return
+            self._discarding = False
+            data = data[idx + 1:]
+        tail = self._ring_head + self._ring_used
+        end = tail + len(data)
+        if end <= len(self._ring):
+            self._ring[tail:end] = data
+            self._ring_used += len(data)
+            return
+        capacity = len(self._ring)
+        overflow = self._ring_used + len(data) - capacity
+        if overflow > 0:
+            cut = self._ring_find(overflow - 1) if overflow <= self._ring_used else -1
+            if cut != -1:
+                self._discard(cut + 1)
+            else:
+                start = max(overflow - self._ring_used - 1, 0)
+                self._discard(self._ring_used)
+                idx = data.find(b'\n', start)
+                keep = idx + 1 if idx != -1 else len(data)
+                self._dropped += data.count(b'\n', 0, keep) + (idx == -1)
+                self._discarding = idx == -1
+                data = data[keep:]
+        tail = (self._ring_head + self._ring_used) % capacity
+        first = min(len(data), capacity - tail)
+        with memoryview(data) as view:
+            self._ring[tail:tail + first] = view[:first]
+            self._ring[:len(data) - first] = view[first:]
+        self._ring_used += len(data)
+    
+    def _take(self) -> bytearray:
+        end = self._ring_head + self._ring_used
+        if end <= len(self._ring):
+            data = self._ring[self._ring_head:end]
+        else:
+            (a0, a1), (b0, b1) = self._ring_segments(self._ring_used)
+            data = self._ring[a0:a1] + self._ring[b0:b1]
+        self._ring_head = self._ring_used = 0
+        return data
+    
+    def _drain(self):
+        active = False
+        while True:
+            with self.lock:
+                stop = self._stopping
+                if self._ring_used or stop:
+                    state = _WRITER_RUNNING
+                else:
+                    state = _WRITER_POLLING if active else _WRITER_SLEEPING
+                self._writer_state = state
+            if state != _WRITER_RUNNING:
+                woken = self._wakeup.acquire(timeout=_DRAIN_INTERVAL if state == _WRITER_POLLING else -1)
+                if not woken:
+                    with self.lock:
+                        if self._writer_state:
+                            self._writer_state = _WRITER_RUNNING
+                        else:
+                            self._wakeup.acquire()
+                active = woken
+                continue
+            with self._write_lock:
+                self._write_batch(flush=False, fsync=False)
+            active = True
+            if stop:
+                return
+    
+    def _write_batch(self, flush: bool, fsync: bool):
+        with self.lock:
+            data = self._take()
+            dropped, self._dropped = self._dropped, 0
+            if flush:
+                self._dirty = False
+        try:
+            self._process_batch(data, dropped, flush, fsync)
+        except Exception as e:
+            print(f"Error writing to log file: {e}", file=self.terminal)
+    
+    def _process_batch(self, data: bytearray, dropped: int, flush: bool, fsync: bool):
+        self._rotate_log_if_needed()
+        if not self.log_file:
+            return
+        timestamp = self._timestamp()
+        if dropped:
+            self.buffer.clear()
+            self._append_record(f"[... {dropped} lines dropped ...]".encode('utf-8'), timestamp)
+        if data:
+            self._append_lines(data, timestamp)
+        self._commit()
+        if flush:
+            self.log_file.flush()
+        if fsync:
+            os.fsync(self.log_file.fileno())
+    
+    def _append_lines(self, data: bytearray, timestamp: bytes):
+        append_record = self._append_record
+        lines = (self.buffer + data).split(b'\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                try:
+                    append_record(line, timestamp)
+                except Exception as e:
+                    print(f"Error formatting log line: {e}", file=self.terminal)
+                    continue
+                if self._scratch_len >= _COMMIT_THRESHOLD:
+                    self._commit()
+    
+    def _append_record(self, line: bytes, timestamp: bytes):
+        record = self._format_line(line, timestamp)
+        end = self._scratch_len + len(record)
+        self._scratch[self._scratch_len:end] = record
+        self._scratch_len = end
+    
+    def _commit(self):
+        if not self._scratch_len:
+            return
+        try:
+            if self.log_file:
+                with memoryview(self._scratch) as view:
+                    self.log_file.write(view[:self._scratch_len])
+        finally:
+            self._scratch_len = 0
+            if len(self._scratch) > _SCRATCH_SOFT_MAX:
+                self._scratch = bytearray(_SCRATCH_SIZE)
+    
+    def _timestamp(self) -> bytes:
+        now = time.time()
+        if not self._ts_resolution:
+            return datetime.datetime.fromtimestamp(now, self.timezone).strftime(self.timestamp_format).encode('utf-8')
+        key = int(now // self._ts_resolution)
+        if key != self._ts_cache_key:
+            if self._ts_use_offset:
+                self._ts_cache_val = time.strftime(self.timestamp_format, time.gmtime(now + self._tz_offset)).encode('utf-8')
+            else:
+                self._ts_cache_val = datetime.datetime.fromtimestamp(now, self.timezone).strftime(self.timestamp_format).encode('utf-8')
+            self._ts_cache_key = key
+        return self._ts_cache_val
+    
+    def _sync(self):
+        self.log_file.flush()
+        os.fsync(self.log_file.fileno())
+    
+    def _flush_log(self, fsync: bool):
+        if self._writer_thread:
+            with self._write_lock:
+                if self._writer_thread and (self._dirty or fsync):
+                    self._write_batch(flush=True, fsync=fsync)
+    
+    def _before_fork(self):
+        self._write_lock.acquire()
+        if self._writer_thread:
+            self._write_batch(flush=True, fsync=False)
+        self.lock.acquire()
+    
+    def _after_fork_in_parent(self):
+        self.lock.release()
+        self._write_lock.release()
+    
+    def _after_fork_in_child(self):
+        self.lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Lock()
+        self._wakeup.acquire()
+        self._writer_state = _WRITER_RUNNING
+        self._ring_head = self._ring_used = 0
+        self._dropped = 0
+        self._discarding = False
+        self._scratch_len = 0
+        self.buffer.clear()
+        self._dirty = False
+        if self._writer_thread:
+            if self._stopping:
+                self._writer_thread = None
+            else:
+                self._start_writer()
     
     def flush(self):
         self.terminal.flush()
-        if self.log_file:
-            self.log_file.flush()
+        self._flush_log(fsync=False)
+    
+    def sync(self):
+        self.terminal.flush()
+        self._flush_log(fsync=True)
     
     def close(self):
-        if self.buffer.strip() and self.log_file:
-            timestamp = datetime.datetime.now(self.timezone).strftime(self.timestamp_format)
-            formatted_line = self.line_format.format(timestamp=timestamp, message=self.buffer.strip())
-            self.log_file.write(f"{formatted_line}\n")
-            self.buffer = ""
+        if self._writer_thread:
+            with self.lock:
+                self._stopping = True
+                if self._writer_state:
+                    self._writer_state = _WRITER_RUNNING
+                    self._wakeup.release()
+            self._writer_thread.join()
         
-        if self.log_file:
-            self.log_file.close()
-            self.log_file = None
+        with self._write_lock:
+            self._writer_thread = None
+            if self.buffer.strip() and self.log_file:
+                try:
+                    self._append_record(bytes(self.buffer.strip()), self._timestamp())
+                except Exception as e:
+                    print(f"Error formatting log line: {e}", file=self.terminal)
+            self.buffer.clear()
+            
+            if self.log_file:
+                self._commit()
+                self._sync()
+                self.log_file.close()
+                self.log_file = None
+
+_forking: Optional[Logger] = None
+
+def _before_fork():
+    global _forking
+    _forking = _active
+    if _forking is not None:
+        _forking._before_fork()
+
+def _after_fork_in_parent():
+    if _forking is not None:
+        _forking._after_fork_in_parent()
+
+def _after_fork_in_child():
+    if _forking is not None:
+        _forking._after_fork_in_child()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child)
 
 __version__ = '1.5.2'
\ No newline at end of file
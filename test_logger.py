@@ -0,0 +1,66 @@
+import datetime
+import unittest
+
+from logger import Logger, _timestamp_resolution
+
+
+class RingTest(unittest.TestCase):
+    def setUp(self):
+        self.logger = Logger("logs", datetime.timezone.utc, "log.txt", "%H:%M:%S", False, False, "[{timestamp}] {message}", "utf-8")
+        self.logger._ring = bytearray(64)
+
+    def test_push_and_take(self):
+        self.logger._push(b"one\n")
+        self.logger._push(b"two\n")
+        self.assertEqual(self.logger._take(), b"one\ntwo\n")
+        self.assertEqual(self.logger._take(), b"")
+        self.assertEqual(self.logger._dropped, 0)
+
+    def test_wrap_around(self):
+        self.logger._push(b"a" * 39 + b"\n")
+        self.logger._take()
+        self.logger._ring_head = 40
+        self.logger._push(b"b" * 29 + b"\n")
+        self.logger._push(b"c" * 9 + b"\n")
+        self.assertEqual(self.logger._ring_head + self.logger._ring_used, 80)
+        self.assertEqual(self.logger._take(), b"b" * 29 + b"\n" + b"c" * 9 + b"\n")
+        self.assertEqual(self.logger._dropped, 0)
+
+    def test_overflow_drops_oldest_lines(self):
+        for i in range(10):
+            self.logger._push(b"line %d\n" % i)
+        data = self.logger._take()
+        self.assertTrue(data.endswith(b"line 9\n"))
+        self.assertEqual(self.logger._dropped + data.count(b"\n"), 10)
+        self.assertEqual(data.split(b"\n")[0], b"line %d" % self.logger._dropped)
+
+    def test_oversized_line_is_dropped_with_its_continuation(self):
+        self.logger._push(b"A" * 50)
+        self.logger._push(b"B" * 50)
+        self.logger._push(b"C\n")
+        self.logger._push(b"next\n")
+        self.assertEqual(self.logger._take(), b"next\n")
+        self.assertEqual(self.logger._dropped, 1)
+
+    def test_oversized_write_keeps_following_lines(self):
+        self.logger._push(b"X\n")
+        self.logger._push(b"Y" * 70 + b"\nZ\n")
+        self.assertEqual(self.logger._take(), b"Z\n")
+        self.assertEqual(self.logger._dropped, 2)
+
+
+class TimestampResolutionTest(unittest.TestCase):
+    def test_seconds_directives(self):
+        for timestamp_format in ('%H:%M:%S', '%-S', '%OS', '%ES', '%T', '%s', '%c', '%k'):
+            self.assertEqual(_timestamp_resolution(timestamp_format), 1, timestamp_format)
+
+    def test_minute_directives(self):
+        for timestamp_format in ('%H:%M', '%d %b %-H:%M %Z', '%%S'):
+            self.assertEqual(_timestamp_resolution(timestamp_format), 60, timestamp_format)
+
+    def test_microseconds(self):
+        self.assertEqual(_timestamp_resolution('%H:%M:%S.%f'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()